@@ -1,6 +1,7 @@
+import argparse
+import multiprocessing
 from pathlib import Path
 
-import matplotlib.pyplot as plt
 import pandas as pd
 
 from src.charging_simulator import (
@@ -8,190 +9,212 @@ from src.charging_simulator import (
     simulate_uncontrolled_charging,
 )
 from src.metrics import calculate_fleet_metrics
+from src.plots import (
+    save_comparison_plot,
+    save_load_and_tariff_plot,
+    save_profile_plots,
+    save_uncontrolled_load_plot,
+)
 from src.profile_generator import generate_ev_profiles, validate_profiles
 from src.tariff import create_time_of_use_tariff, calculate_total_charging_cost
 
-
-def save_profile_plots(profiles_df, figures_dir: Path) -> None:
-    figures_dir.mkdir(parents=True, exist_ok=True)
-
-    plt.figure(figsize=(8, 4))
-    plt.hist(
-        profiles_df["arrival_hour"], bins=range(0, 25), edgecolor="black", align="left"
+# Each scenario runs the pipeline up to and including that day
+SCENARIO_TITLES = {
+    "day1": "Day 1: Synthetic EV profiles",
+    "day2": "Day 2: Uncontrolled charging",
+    "day3": "Day 3: Rule-based smart charging",
+    "day4": "Day 4: Cost-aware comparison",
+}
+
+# --format choice -> file formats written for every table (feather needs pyarrow)
+OUTPUT_FORMATS = {
+    "csv": ("csv",),
+    "feather": ("feather",),
+    "both": ("csv", "feather"),
+}
+
+SCENARIO_LABELS = {
+    "uncontrolled": "Uncontrolled",
+    "smart_rule_based": "Smart (rule-based)",
+}
+
+
+def save_tables(tables: dict, output_dir: Path, formats=("csv",)) -> None:
+    """
+    Write each DataFrame in tables (name -> DataFrame) to output_dir/<name>.<format>.
+    CSV values are already rounded by the simulators, so pandas' default float output is kept.
+    Feather files are typed columnar binaries and read back with pd.read_feather.
+    """
+    for name, df in tables.items():
+        if "csv" in formats:
+            df.to_csv(output_dir / f"{name}.csv", index=False)
+        if "feather" in formats:
+            df.to_feather(output_dir / f"{name}.feather")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="EV fleet charging simulation pipeline")
+    parser.add_argument(
+        "--scenario",
+        choices=list(SCENARIO_TITLES),
+        default="day4",
+        help="run the pipeline up to and including this day (default: day4, everything)",
     )
-    plt.xticks(range(0, 24))
-    plt.xlabel("Arrival Hour")
-    plt.ylabel("Number of EVs")
-    plt.title("EV Arrival Hour Distribution (Synthetic Profiles)")
-    plt.tight_layout()
-    plt.savefig(figures_dir / "arrival_hour_histogram.png", dpi=150)
-    plt.close()
-
-    plt.figure(figsize=(8, 4))
-    plt.hist(profiles_df["energy_needed_kwh"], bins=10, edgecolor="black")
-    plt.xlabel("Energy Needed (kWh)")
-    plt.ylabel("Number of EVs")
-    plt.title("Energy Needed Distribution (Synthetic Profiles)")
-    plt.tight_layout()
-    plt.savefig(figures_dir / "energy_needed_histogram.png", dpi=150)
-    plt.close()
-
-
-def save_uncontrolled_load_plot(fleet_load_df, figures_dir: Path) -> None:
-    plt.figure(figsize=(9, 4.5))
-    plt.plot(fleet_load_df["hour"], fleet_load_df["fleet_load_kw"], marker="o")
-    plt.xticks(range(0, 24))
-    plt.xlabel("Hour of Day")
-    plt.ylabel("Fleet Charging Load (kW)")
-    plt.title("Uncontrolled EV Charging - Aggregate Fleet Load")
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(figures_dir / "aggregate_load_uncontrolled.png", dpi=150)
-    plt.close()
-
-
-def save_comparison_plot(load_a, load_b, labels, figures_dir: Path, filename: str) -> None:
-    plt.figure(figsize=(9, 4.5))
-    plt.plot(load_a["hour"], load_a["fleet_load_kw"], marker="o", label=labels[0])
-    plt.plot(load_b["hour"], load_b["fleet_load_kw"], marker="o", label=labels[1])
-    plt.xticks(range(0, 24))
-    plt.xlabel("Hour of Day")
-    plt.ylabel("Fleet Charging Load (kW)")
-    plt.title("Fleet Load Comparison")
-    plt.grid(True, alpha=0.3)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(figures_dir / filename, dpi=150)
-    plt.close()
-
-
-def save_load_and_tariff_plot(fleet_unctrl, fleet_smart, tariff_df, figures_dir: Path) -> None:
-    fig, ax1 = plt.subplots(figsize=(10, 5))
-
-    ax1.plot(fleet_unctrl["hour"], fleet_unctrl["fleet_load_kw"], marker="o", label="Uncontrolled")
-    ax1.plot(fleet_smart["hour"], fleet_smart["fleet_load_kw"], marker="o", label="Smart (Rule-based)")
-    ax1.set_xlabel("Hour of Day")
-    ax1.set_ylabel("Fleet Charging Load (kW)")
-    ax1.set_xticks(range(0, 24))
-    ax1.grid(True, alpha=0.3)
-
-    ax2 = ax1.twinx()
-    ax2.plot(
-        tariff_df["hour"],
-        tariff_df["price_eur_per_kwh"],
-        linestyle="--",
-        marker="s",
-        label="Tariff (EUR/kWh)",
+    parser.add_argument(
+        "--format",
+        choices=list(OUTPUT_FORMATS),
+        default="csv",
+        help="file format for the result tables (default: csv; feather requires pyarrow)",
     )
-    ax2.set_ylabel("Tariff (EUR/kWh)")
-
-    lines1, labels1 = ax1.get_legend_handles_labels()
-    lines2, labels2 = ax2.get_legend_handles_labels()
-    ax1.legend(lines1 + lines2, labels1 + labels2, loc="upper left")
+    return parser.parse_args(argv)
 
-    plt.title("Fleet Load and Time-of-Use Tariff")
-    plt.tight_layout()
-    plt.savefig(figures_dir / "fleet_load_and_tariff_comparison.png", dpi=150)
-    plt.close()
 
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    last_day = list(SCENARIO_TITLES).index(args.scenario) + 1
+    formats = OUTPUT_FORMATS[args.format]
 
-def main() -> None:
     output_dir = Path("results")
     figures_dir = output_dir / "figures"
     output_dir.mkdir(parents=True, exist_ok=True)
     figures_dir.mkdir(parents=True, exist_ok=True)
 
-    profiles_df = generate_ev_profiles(n_evs=50, seed=42)
-    validate_profiles(profiles_df)
-
-    profiles_path = output_dir / "ev_profiles_day1.csv"
-    profiles_df.to_csv(profiles_path, index=False)
-
-    save_profile_plots(profiles_df, figures_dir)
-
-    charging_power_kw = 7.0
-    peak_hours = [16, 17, 18]
-
-    fleet_unctrl, ev_unctrl = simulate_uncontrolled_charging(
-        profiles_df=profiles_df,
-        charging_power_kw=charging_power_kw,
-    )
-
-    fleet_smart, ev_smart = simulate_rule_based_smart_charging(
-        profiles_df=profiles_df,
-        charging_power_kw=charging_power_kw,
-        peak_hours=peak_hours,
-    )
-
-    tariff_df = create_time_of_use_tariff()
-    tariff_df.to_csv(output_dir / "tariff_schedule.csv", index=False)
-
-    cost_unctrl = calculate_total_charging_cost(fleet_unctrl, tariff_df)
-    cost_smart = calculate_total_charging_cost(fleet_smart, tariff_df)
-
-    metrics_unctrl = calculate_fleet_metrics(fleet_unctrl, ev_unctrl, total_cost_eur=cost_unctrl)
-    metrics_smart = calculate_fleet_metrics(fleet_smart, ev_smart, total_cost_eur=cost_smart)
-
-    fleet_unctrl.to_csv(output_dir / "fleet_load_uncontrolled.csv", index=False)
-    ev_unctrl.to_csv(output_dir / "ev_results_uncontrolled.csv", index=False)
-
-    fleet_smart.to_csv(output_dir / "fleet_load_smart_rule_based.csv", index=False)
-    ev_smart.to_csv(output_dir / "ev_results_smart_rule_based.csv", index=False)
-
-    save_uncontrolled_load_plot(fleet_unctrl, figures_dir)
-    save_comparison_plot(
-        fleet_unctrl,
-        fleet_smart,
-        labels=["Uncontrolled", "Smart (Rule-based)"],
-        figures_dir=figures_dir,
-        filename="fleet_load_comparison_uncontrolled_vs_smart.png",
-    )
-    save_load_and_tariff_plot(fleet_unctrl, fleet_smart, tariff_df, figures_dir)
-
-    merged = profiles_df.merge(
-        ev_unctrl, on=["ev_id", "arrival_hour", "departure_hour", "energy_needed_kwh"]
-    )
-    merged["max_possible_energy_kwh"] = merged["available_hours"] * charging_power_kw
-    merged["feasible"] = merged["energy_needed_kwh"] <= merged["max_possible_energy_kwh"] + 1e-9
-
-    not_completed = merged[merged["completed"] == False].copy()
-
-    metrics_df = pd.DataFrame(
-        [
-            {"scenario": "uncontrolled", **metrics_unctrl},
-            {"scenario": "smart_rule_based", **metrics_smart},
-        ]
-    )
-    metrics_df.to_csv(output_dir / "metrics_comparison_day4.csv", index=False)
-
-    print("=== Day 4: Cost-aware comparison ===")
-    print(f"Profiles saved: {profiles_path}")
-    print("Peak avoidance hours:", peak_hours)
-    print()
-
-    print("Uncontrolled metrics:")
-    for k, v in metrics_unctrl.items():
-        print(f" - {k}: {v}")
-    print()
-
-    print("Smart (rule-based) metrics:")
-    for k, v in metrics_smart.items():
-        print(f" - {k}: {v}")
-    print()
-
-    cost_saving = cost_unctrl - cost_smart
-    cost_saving_pct = (cost_saving / cost_unctrl * 100) if cost_unctrl > 0 else 0.0
-
-    print("Cost comparison:")
-    print(f" - uncontrolled_cost_eur: {round(cost_unctrl, 2)}")
-    print(f" - smart_cost_eur: {round(cost_smart, 2)}")
-    print(f" - cost_saving_eur: {round(cost_saving, 2)}")
-    print(f" - cost_saving_pct: {round(cost_saving_pct, 2)}")
-    print()
-
-    print("=== Root-cause: Incomplete EVs (Uncontrolled) ===")
-    print("Not completed EVs:", len(not_completed))
-    print("Not completed but feasible (should be near 0):", int(not_completed["feasible"].sum()))
+    profiles = generate_ev_profiles(n_evs=50, seed=42)
+    validate_profiles(profiles)
+
+    # The simulators work on the arrays directly; the DataFrame is only needed for
+    # the CSV and the feasibility join below
+    profiles_df = profiles.to_frame()
+    save_tables({"ev_profiles_day1": profiles_df}, output_dir, formats)
+    profiles_path = output_dir / f"ev_profiles_day1.{formats[0]}"
+
+    # Figures are rendered in worker processes (pyplot is not thread-safe) while the
+    # simulations, CSV writes and analysis continue in the main process
+    with multiprocessing.Pool(processes=2) as plot_pool:
+        plot_jobs = [plot_pool.apply_async(save_profile_plots, (profiles, figures_dir))]
+
+        charging_power_kw = 7.0
+        peak_hours = [16, 17, 18]
+
+        # scenario name -> (fleet_load_df, ev_results_df)
+        results = {}
+
+        if last_day >= 2:
+            results["uncontrolled"] = simulate_uncontrolled_charging(
+                profiles_df=profiles,
+                charging_power_kw=charging_power_kw,
+            )
+            fleet_unctrl, ev_unctrl = results["uncontrolled"]
+            plot_jobs.append(
+                plot_pool.apply_async(save_uncontrolled_load_plot, (fleet_unctrl, figures_dir))
+            )
+
+        if last_day >= 3:
+            results["smart_rule_based"] = simulate_rule_based_smart_charging(
+                profiles_df=profiles,
+                charging_power_kw=charging_power_kw,
+                peak_hours=peak_hours,
+            )
+            fleet_smart, ev_smart = results["smart_rule_based"]
+            plot_jobs.append(
+                plot_pool.apply_async(
+                    save_comparison_plot,
+                    (fleet_unctrl, fleet_smart),
+                    dict(
+                        labels=["Uncontrolled", "Smart (Rule-based)"],
+                        figures_dir=figures_dir,
+                        filename="fleet_load_comparison_uncontrolled_vs_smart.png",
+                    ),
+                )
+            )
+
+        # scenario name -> total charging cost (EUR)
+        costs = {}
+
+        if last_day >= 4:
+            tariff_df = create_time_of_use_tariff()
+            save_tables({"tariff_schedule": tariff_df}, output_dir, formats)
+
+            costs = {
+                name: calculate_total_charging_cost(fleet_load_df, tariff_df)
+                for name, (fleet_load_df, _) in results.items()
+            }
+            plot_jobs.append(
+                plot_pool.apply_async(
+                    save_load_and_tariff_plot, (fleet_unctrl, fleet_smart, tariff_df, figures_dir)
+                )
+            )
+
+        plot_pool.close()
+
+        metrics = {
+            name: calculate_fleet_metrics(
+                fleet_load_df, ev_results_df, total_cost_eur=costs.get(name)
+            )
+            for name, (fleet_load_df, ev_results_df) in results.items()
+        }
+
+        tables = {}
+        for name, (fleet_load_df, ev_results_df) in results.items():
+            tables[f"fleet_load_{name}"] = fleet_load_df
+            tables[f"ev_results_{name}"] = ev_results_df
+        save_tables(tables, output_dir, formats)
+
+        if last_day >= 3:
+            # ev_id is unique per EV: join on it alone and only bring over the result columns
+            result_cols = ["energy_delivered_kwh", "energy_shortfall_kwh", "completed"]
+            merged = (
+                profiles_df.set_index("ev_id")
+                .join(ev_unctrl.set_index("ev_id")[result_cols], how="inner")
+                .reset_index()
+            )
+            merged["max_possible_energy_kwh"] = merged["available_hours"] * charging_power_kw
+            merged["feasible"] = merged["energy_needed_kwh"] <= merged["max_possible_energy_kwh"] + 1e-9
+
+            not_completed = merged[~merged["completed"]]
+
+            metrics_df = pd.DataFrame(
+                [
+                    {"scenario": name, **scenario_metrics}
+                    for name, scenario_metrics in metrics.items()
+                ]
+            )
+            save_tables({f"metrics_comparison_day{last_day}": metrics_df}, output_dir, formats)
+
+        print(f"=== {SCENARIO_TITLES[args.scenario]} ===")
+        print(f"Profiles saved: {profiles_path}")
+        if last_day >= 3:
+            print("Peak avoidance hours:", peak_hours)
+        print()
+
+        for name, scenario_metrics in metrics.items():
+            print(f"{SCENARIO_LABELS[name]} metrics:")
+            for k, v in scenario_metrics.items():
+                print(f" - {k}: {v}")
+            print()
+
+        if costs:
+            cost_unctrl = costs["uncontrolled"]
+            cost_smart = costs["smart_rule_based"]
+            cost_saving = cost_unctrl - cost_smart
+            cost_saving_pct = (cost_saving / cost_unctrl * 100) if cost_unctrl > 0 else 0.0
+
+            print("Cost comparison:")
+            print(f" - uncontrolled_cost_eur: {round(cost_unctrl, 2)}")
+            print(f" - smart_cost_eur: {round(cost_smart, 2)}")
+            print(f" - cost_saving_eur: {round(cost_saving, 2)}")
+            print(f" - cost_saving_pct: {round(cost_saving_pct, 2)}")
+            print()
+
+        if last_day >= 3:
+            print("=== Root-cause: Incomplete EVs (Uncontrolled) ===")
+            print("Not completed EVs:", len(not_completed))
+            print("Not completed but feasible (should be near 0):", int(not_completed["feasible"].sum()))
+
+        # Wait for the figures and re-raise any error from the plotting workers; leaving
+        # the block terminates the pool, also when anything above raises
+        for job in plot_jobs:
+            job.get()
 
 
 if __name__ == "__main__":
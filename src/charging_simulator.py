@@ -1,13 +1,150 @@
 from __future__ import annotations
 
-from typing import Tuple
+from typing import Tuple, Union
 
 import numpy as np
 import pandas as pd
 
+from .profile_generator import Profiles
+
+
+def _build_peak_mask(peak_hours, n_hours: int = 24) -> np.ndarray:
+    """
+    Boolean lookup over the hours of the day: peak_mask[h] is True when h is a peak hour.
+    Accepts any iterable of hours (list, tuple, set, array). Hours outside 0..n_hours-1
+    never match a charging slot, so they are ignored (no wrap-around for negative hours).
+    """
+    peak_mask = np.zeros(n_hours, dtype=bool)
+    hours = np.fromiter(peak_hours, dtype=np.int64)
+    peak_mask[hours[(hours >= 0) & (hours < n_hours)]] = True
+    return peak_mask
+
+
+# Precomputed, read-only masks for the common cases: the default peak hours and none at all
+_DEFAULT_PEAK_HOURS = (16, 17, 18)
+_DEFAULT_PEAK_MASK = _build_peak_mask(_DEFAULT_PEAK_HOURS)
+_DEFAULT_PEAK_MASK.setflags(write=False)
+_NO_PEAK_MASK = np.zeros(24, dtype=bool)
+_NO_PEAK_MASK.setflags(write=False)
+
+
+def _profile_arrays(
+    profiles: Union[pd.DataFrame, Profiles],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pull ev_id, arrival_hour, departure_hour and energy_needed_kwh out as NumPy arrays.
+    Works for a profiles DataFrame and for a Profiles (no copy when dtypes already match).
+    """
+    return (
+        np.asarray(profiles["ev_id"], dtype=np.int64),
+        np.asarray(profiles["arrival_hour"], dtype=np.int64),
+        np.asarray(profiles["departure_hour"], dtype=np.int64),
+        np.asarray(profiles["energy_needed_kwh"], dtype=float),
+    )
+
+
+def _expand_charging_windows(
+    arrival: np.ndarray,
+    departure: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Flatten every EV's charging window into flat per-slot arrays.
+
+    EV i contributes hours arrival[i] .. departure[i]-1 with offsets 0 .. available[i]-1.
+    Returns:
+    - available: number of available hours per EV
+    - hour_idx: hour of day of each slot
+    - offsets: position of each slot inside its EV's window
+    """
+    available = np.maximum(departure - arrival, 0)
+    window_starts = np.cumsum(available) - available
+    offsets = np.arange(available.sum()) - np.repeat(window_starts, available)
+    hour_idx = np.repeat(arrival, available) + offsets
+    return available, hour_idx, offsets
+
+
+def _simulate_schedule(
+    arrival: np.ndarray,
+    departure: np.ndarray,
+    energy_needed: np.ndarray,
+    charging_power_kw: float,
+    peak_mask: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hourly charging kernel shared by both strategies.
+
+    Within each EV's window, non-peak hours are filled first (in time order), then
+    peak hours (in time order). An all-False peak_mask gives uncontrolled charging.
+    Returns:
+    - hourly_load_kw: aggregate fleet load per hour
+    - energy_delivered: energy delivered per EV (kWh)
+    """
+    hourly_load_kw = np.zeros(peak_mask.shape[0], dtype=float)
+
+    available, hour_idx, offsets = _expand_charging_windows(arrival, departure)
+
+    # Charging priority of each slot inside its EV's window
+    peak_count_before = np.concatenate(([0], np.cumsum(peak_mask)))
+    slot_arrival = np.repeat(arrival, available)
+    peak_before_slot = peak_count_before[hour_idx] - peak_count_before[slot_arrival]
+    non_peak_in_window = available - (peak_count_before[departure] - peak_count_before[arrival])
+    priority = np.where(
+        peak_mask[hour_idx],
+        np.repeat(non_peak_in_window, available) + peak_before_slot,
+        offsets - peak_before_slot,
+    )
+
+    # Fill slots in priority order: full power, one partial slot, then nothing.
+    # 1-hour timestep, so kWh delivered in a slot == average kW over that slot
+    energy_per_slot = np.clip(
+        np.repeat(energy_needed, available) - priority * charging_power_kw,
+        0.0,
+        charging_power_kw,
+    )
+    np.add.at(hourly_load_kw, hour_idx, energy_per_slot)
+
+    energy_delivered = np.minimum(energy_needed, available * charging_power_kw)
+
+    return hourly_load_kw, energy_delivered
+
+
+def _build_result_frames(
+    ev_ids: np.ndarray,
+    arrival: np.ndarray,
+    departure: np.ndarray,
+    energy_needed: np.ndarray,
+    hourly_load_kw: np.ndarray,
+    energy_delivered: np.ndarray,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Build fleet_load_df and ev_results_df column-wise from per-hour and per-EV arrays.
+    """
+    completed = energy_delivered >= energy_needed - 1e-6
+
+    fleet_load_df = pd.DataFrame(
+        {
+            "hour": np.arange(hourly_load_kw.shape[0]),
+            "fleet_load_kw": hourly_load_kw.round(3),
+        }
+    )
+
+    ev_results_df = pd.DataFrame(
+        {
+            "ev_id": ev_ids,
+            "arrival_hour": arrival,
+            "departure_hour": departure,
+            "energy_needed_kwh": np.round(energy_needed, 3),
+            "energy_delivered_kwh": np.round(energy_delivered, 3),
+            "energy_shortfall_kwh": np.round(np.maximum(0.0, energy_needed - energy_delivered), 3),
+            "completed": completed,
+        }
+    )
+
+    return fleet_load_df, ev_results_df
+
 
 def simulate_uncontrolled_charging(
-    profiles_df: pd.DataFrame,
+    profiles_df: Union[pd.DataFrame, Profiles],
     charging_power_kw: float = 7.0,
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
@@ -24,59 +161,23 @@ def simulate_uncontrolled_charging(
     - fleet_load_df: hourly aggregate fleet load
     - ev_results_df: per-EV charging results
     """
-    n_hours = 24
-    hourly_load_kw = np.zeros(n_hours, dtype=float)
-
-    ev_results = []
-
-    for _, row in profiles_df.iterrows():
-        ev_id = int(row["ev_id"])
-        arrival = int(row["arrival_hour"])
-        departure = int(row["departure_hour"])
-        energy_needed = float(row["energy_needed_kwh"])
-
-        remaining_energy = energy_needed
-        energy_delivered = 0.0
-
-        # For hourly resolution: each hour can deliver up to charging_power_kw * 1h = charging_power_kw kWh
-        for hour in range(arrival, departure):
-            if remaining_energy <= 1e-9:
-                break
-
-            energy_this_hour = min(charging_power_kw, remaining_energy)  # kWh in 1 hour
-            power_this_hour = energy_this_hour  # because 1-hour timestep, kWh == average kW over that hour
-
-            hourly_load_kw[hour] += power_this_hour
-            remaining_energy -= energy_this_hour
-            energy_delivered += energy_this_hour
-
-        completed = energy_delivered >= energy_needed - 1e-6
-
-        ev_results.append(
-            {
-                "ev_id": ev_id,
-                "arrival_hour": arrival,
-                "departure_hour": departure,
-                "energy_needed_kwh": round(energy_needed, 3),
-                "energy_delivered_kwh": round(energy_delivered, 3),
-                "energy_shortfall_kwh": round(max(0.0, energy_needed - energy_delivered), 3),
-                "completed": completed,
-            }
-        )
-
-    fleet_load_df = pd.DataFrame(
-        {
-            "hour": np.arange(n_hours),
-            "fleet_load_kw": hourly_load_kw.round(3),
-        }
+    ev_ids, arrival, departure, energy_needed = _profile_arrays(profiles_df)
+
+    # No peak hours: every EV charges from arrival onwards
+    hourly_load_kw, energy_delivered = _simulate_schedule(
+        arrival,
+        departure,
+        energy_needed,
+        charging_power_kw,
+        peak_mask=_NO_PEAK_MASK,
     )
 
-    ev_results_df = pd.DataFrame(ev_results)
-
-    return fleet_load_df, ev_results_df
+    return _build_result_frames(
+        ev_ids, arrival, departure, energy_needed, hourly_load_kw, energy_delivered
+    )
 
 def simulate_rule_based_smart_charging(
-    profiles_df: pd.DataFrame,
+    profiles_df: Union[pd.DataFrame, Profiles],
     charging_power_kw: float = 7.0,
     peak_hours: list = None,
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
@@ -89,56 +190,16 @@ def simulate_rule_based_smart_charging(
     peak_hours: list of hours to avoid (e.g., [16,17,18])
     """
     if peak_hours is None:
-        peak_hours = [16, 17, 18]
-
-    n_hours = 24
-    hourly_load_kw = np.zeros(n_hours, dtype=float)
-    ev_results = []
-
-    for _, row in profiles_df.iterrows():
-        ev_id = int(row["ev_id"])
-        arrival = int(row["arrival_hour"])
-        departure = int(row["departure_hour"])
-        energy_needed = float(row["energy_needed_kwh"])
-
-        remaining_energy = energy_needed
-        energy_delivered = 0.0
+        peak_mask = _DEFAULT_PEAK_MASK
+    else:
+        peak_mask = _build_peak_mask(peak_hours)
 
-        available_hours = list(range(arrival, departure))
-        non_peak = [h for h in available_hours if h not in peak_hours]
-        peak = [h for h in available_hours if h in peak_hours]
+    ev_ids, arrival, departure, energy_needed = _profile_arrays(profiles_df)
 
-        # Prefer non-peak hours first
-        preferred_schedule = non_peak + peak
-
-        for hour in preferred_schedule:
-            if remaining_energy <= 1e-9:
-                break
-
-            energy_this_hour = min(charging_power_kw, remaining_energy)  # kWh in 1 hour
-            power_this_hour = energy_this_hour  # average kW over 1 hour step
-
-            hourly_load_kw[hour] += power_this_hour
-            remaining_energy -= energy_this_hour
-            energy_delivered += energy_this_hour
-
-        completed = energy_delivered >= energy_needed - 1e-6
-
-        ev_results.append(
-            {
-                "ev_id": ev_id,
-                "arrival_hour": arrival,
-                "departure_hour": departure,
-                "energy_needed_kwh": round(energy_needed, 3),
-                "energy_delivered_kwh": round(energy_delivered, 3),
-                "energy_shortfall_kwh": round(max(0.0, energy_needed - energy_delivered), 3),
-                "completed": completed,
-            }
-        )
-
-    fleet_load_df = pd.DataFrame(
-        {"hour": np.arange(n_hours), "fleet_load_kw": hourly_load_kw.round(3)}
+    hourly_load_kw, energy_delivered = _simulate_schedule(
+        arrival, departure, energy_needed, charging_power_kw, peak_mask
     )
-    ev_results_df = pd.DataFrame(ev_results)
 
-    return fleet_load_df, ev_results_df
\ No newline at end of file
+    return _build_result_frames(
+        ev_ids, arrival, departure, energy_needed, hourly_load_kw, energy_delivered
+    )
\ No newline at end of file
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -9,12 +10,16 @@ def calculate_fleet_metrics(
     peak_load_kw = float(fleet_load_df["fleet_load_kw"].max())
     total_energy_delivered_kwh = float(ev_results_df["energy_delivered_kwh"].sum())
     total_energy_needed_kwh = float(ev_results_df["energy_needed_kwh"].sum())
-    completion_rate = float(ev_results_df["completed"].mean()) if len(ev_results_df) else 0.0
 
-    shortfalls = ev_results_df.loc[~ev_results_df["completed"], "energy_shortfall_kwh"]
-    avg_shortfall = float(shortfalls.mean()) if len(shortfalls) else 0.0
-    p95_shortfall = float(shortfalls.quantile(0.95)) if len(shortfalls) else 0.0
-    n_incomplete = int((~ev_results_df["completed"]).sum())
+    # One mask and one gather; the counts and rate follow from the gathered size
+    completed = ev_results_df["completed"].to_numpy(dtype=bool)
+    shortfalls = ev_results_df["energy_shortfall_kwh"].to_numpy()[~completed]
+    n_evs = completed.size
+    n_incomplete = shortfalls.size
+    completion_rate = (n_evs - n_incomplete) / n_evs if n_evs else 0.0
+
+    avg_shortfall = float(shortfalls.sum()) / n_incomplete if n_incomplete else 0.0
+    p95_shortfall = float(np.quantile(shortfalls, 0.95)) if n_incomplete else 0.0
 
     metrics = {
         "peak_load_kw": round(peak_load_kw, 3),
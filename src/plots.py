@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import matplotlib
+
+# Non-interactive backend: figures are only written to PNG
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+
+def save_profile_plots(profiles, figures_dir: Path) -> None:
+    figures_dir.mkdir(parents=True, exist_ok=True)
+
+    fig, ax = plt.subplots(figsize=(8, 4))
+
+    # Count with np.histogram and draw the bars directly; one bar centred on each hour
+    counts, edges = np.histogram(profiles["arrival_hour"], bins=np.arange(25))
+    ax.bar(edges[:-1], counts, width=1.0, edgecolor="black")
+    ax.set_xticks(range(0, 24))
+    ax.set_xlabel("Arrival Hour")
+    ax.set_ylabel("Number of EVs")
+    ax.set_title("EV Arrival Hour Distribution (Synthetic Profiles)")
+    fig.tight_layout()
+    fig.savefig(figures_dir / "arrival_hour_histogram.png", dpi=150)
+    plt.close(fig)
+
+    # Separate figure: tight_layout on a reused one would start from the previous plot's
+    # adjusted subplot parameters and shift the layout
+    fig, ax = plt.subplots(figsize=(8, 4))
+    # Centre each bar on its bin, as ax.hist does, so the edges land on the same pixels
+    counts, edges = np.histogram(profiles["energy_needed_kwh"], bins=10)
+    widths = np.diff(edges)
+    ax.bar(edges[:-1] + 0.5 * widths, counts, width=widths, edgecolor="black")
+    ax.set_xlabel("Energy Needed (kWh)")
+    ax.set_ylabel("Number of EVs")
+    ax.set_title("Energy Needed Distribution (Synthetic Profiles)")
+    fig.tight_layout()
+    fig.savefig(figures_dir / "energy_needed_histogram.png", dpi=150)
+    plt.close(fig)
+
+
+def save_uncontrolled_load_plot(fleet_load_df, figures_dir: Path) -> None:
+    fig, ax = plt.subplots(figsize=(9, 4.5))
+    ax.plot(fleet_load_df["hour"], fleet_load_df["fleet_load_kw"], marker="o")
+    ax.set_xticks(range(0, 24))
+    ax.set_xlabel("Hour of Day")
+    ax.set_ylabel("Fleet Charging Load (kW)")
+    ax.set_title("Uncontrolled EV Charging - Aggregate Fleet Load")
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(figures_dir / "aggregate_load_uncontrolled.png", dpi=150)
+    plt.close(fig)
+
+
+def save_comparison_plot(load_a, load_b, labels, figures_dir: Path, filename: str) -> None:
+    fig, ax = plt.subplots(figsize=(9, 4.5))
+    ax.plot(load_a["hour"], load_a["fleet_load_kw"], marker="o", label=labels[0])
+    ax.plot(load_b["hour"], load_b["fleet_load_kw"], marker="o", label=labels[1])
+    ax.set_xticks(range(0, 24))
+    ax.set_xlabel("Hour of Day")
+    ax.set_ylabel("Fleet Charging Load (kW)")
+    ax.set_title("Fleet Load Comparison")
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(figures_dir / filename, dpi=150)
+    plt.close(fig)
+
+
+def save_load_and_tariff_plot(fleet_unctrl, fleet_smart, tariff_df, figures_dir: Path) -> None:
+    fig, ax1 = plt.subplots(figsize=(10, 5))
+
+    ax1.plot(fleet_unctrl["hour"], fleet_unctrl["fleet_load_kw"], marker="o", label="Uncontrolled")
+    ax1.plot(fleet_smart["hour"], fleet_smart["fleet_load_kw"], marker="o", label="Smart (Rule-based)")
+    ax1.set_xlabel("Hour of Day")
+    ax1.set_ylabel("Fleet Charging Load (kW)")
+    ax1.set_xticks(range(0, 24))
+    ax1.grid(True, alpha=0.3)
+
+    ax2 = ax1.twinx()
+    ax2.plot(
+        tariff_df["hour"],
+        tariff_df["price_eur_per_kwh"],
+        linestyle="--",
+        marker="s",
+        label="Tariff (EUR/kWh)",
+    )
+    ax2.set_ylabel("Tariff (EUR/kWh)")
+
+    lines1, labels1 = ax1.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax1.legend(lines1 + lines2, labels1 + labels2, loc="upper left")
+
+    ax2.set_title("Fleet Load and Time-of-Use Tariff")
+    fig.tight_layout()
+    fig.savefig(figures_dir / "fleet_load_and_tariff_comparison.png", dpi=150)
+    plt.close(fig)
\ No newline at end of file
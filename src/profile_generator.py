@@ -1,13 +1,60 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Union
+
 import numpy as np
 import pandas as pd
 
 
+@dataclass(eq=False)
+class Profiles:
+    """
+    Synthetic EV profiles stored column-wise: one NumPy array per field, one entry per EV.
+
+    Columns can be read like a DataFrame (profiles["arrival_hour"]), so the simulators
+    and validate_profiles accept either. Use to_frame() for CSV output and plotting.
+    Equality compares every column with np.array_equal.
+    """
+
+    ev_id: np.ndarray
+    arrival_hour: np.ndarray
+    departure_hour: np.ndarray
+    battery_kwh: np.ndarray
+    initial_soc: np.ndarray
+    target_soc: np.ndarray
+    energy_needed_kwh: np.ndarray
+    available_hours: np.ndarray
+
+    @property
+    def columns(self) -> list:
+        return [f.name for f in fields(self)]
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        if column not in self.columns:
+            raise KeyError(column)
+        return getattr(self, column)
+
+    def __len__(self) -> int:
+        return len(self.ev_id)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Profiles):
+            return NotImplemented
+        return all(np.array_equal(self[column], other[column]) for column in self.columns)
+
+    def copy(self) -> Profiles:
+        return Profiles(**{column: self[column].copy() for column in self.columns})
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({column: self[column] for column in self.columns})
+
+
 def generate_ev_profiles(
     n_evs: int = 50,
     seed: int = 42,
-) -> pd.DataFrame:
+) -> Profiles:
     """
     Generate synthetic EV charging profiles for a single day.
 
@@ -19,10 +66,19 @@ def generate_ev_profiles(
     - initial_soc
     - target_soc
 
+    Returns a Profiles (one NumPy array per field, plus the derived energy_needed_kwh
+    and available_hours); call .to_frame() for a DataFrame.
+
     Notes:
     - This is a simple synthetic generator for Day 1.
     - We keep departure on the same day to avoid midnight complexity for now.
+    - Results are memoized per (n_evs, seed); each call returns its own copy.
     """
+    return _generate_ev_profiles_cached(n_evs, seed).copy()
+
+
+@lru_cache(maxsize=8)
+def _generate_ev_profiles_cached(n_evs: int, seed: int) -> Profiles:
     rng = np.random.default_rng(seed)
 
     ev_ids = np.arange(1, n_evs + 1)
@@ -30,12 +86,8 @@ def generate_ev_profiles(
     # Arrival between 0 and 20 so we can guarantee at least 1 hour before midnight
     arrival_hours = rng.integers(low=0, high=21, size=n_evs)
 
-    departure_hours = []
-    for arrival in arrival_hours:
-        # At least 1 hour after arrival, at most 23
-        dep = rng.integers(low=arrival + 1, high=24)
-        departure_hours.append(dep)
-    departure_hours = np.array(departure_hours)
+    # At least 1 hour after arrival, at most 23 (per-EV lower bound, one batched draw)
+    departure_hours = rng.integers(low=arrival_hours + 1, high=24)
 
     # Typical EV battery sizes (kWh), simple uniform distribution
     battery_kwh = rng.uniform(low=40.0, high=80.0, size=n_evs).round(1)
@@ -49,31 +101,29 @@ def generate_ev_profiles(
     target_soc = np.clip(target_soc, 0.80, 0.95).round(2)
 
     # If clipping caused target <= initial for any edge case, fix it
-    for i in range(n_evs):
-        if target_soc[i] <= initial_soc[i]:
-            target_soc[i] = min(0.95, round(initial_soc[i] + 0.10, 2))
-
-    df = pd.DataFrame(
-        {
-            "ev_id": ev_ids,
-            "arrival_hour": arrival_hours,
-            "departure_hour": departure_hours,
-            "battery_kwh": battery_kwh,
-            "initial_soc": initial_soc,
-            "target_soc": target_soc,
-        }
+    target_soc = np.where(
+        target_soc <= initial_soc,
+        np.minimum(0.95, np.round(initial_soc + 0.10, 2)),
+        target_soc,
     )
 
     # Derived fields for convenience
-    df["energy_needed_kwh"] = (
-        df["battery_kwh"] * (df["target_soc"] - df["initial_soc"])
-    ).round(2)
-    df["available_hours"] = df["departure_hour"] - df["arrival_hour"]
-
-    return df
+    energy_needed_kwh = (battery_kwh * (target_soc - initial_soc)).round(2)
+    available_hours = departure_hours - arrival_hours
+
+    return Profiles(
+        ev_id=ev_ids,
+        arrival_hour=arrival_hours,
+        departure_hour=departure_hours,
+        battery_kwh=battery_kwh,
+        initial_soc=initial_soc,
+        target_soc=target_soc,
+        energy_needed_kwh=energy_needed_kwh,
+        available_hours=available_hours,
+    )
 
 
-def validate_profiles(df: pd.DataFrame) -> None:
+def validate_profiles(df: Union[pd.DataFrame, Profiles]) -> None:
     """
     Basic validation checks for generated profiles.
     Raises ValueError if any check fails.
@@ -92,32 +142,40 @@ def validate_profiles(df: pd.DataFrame) -> None:
     if missing:
         raise ValueError(f"Missing columns: {missing}")
 
-    if (df["arrival_hour"] < 0).any() or (df["arrival_hour"] > 23).any():
+    # Pull each column out once and run the checks on plain NumPy arrays
+    arrival = np.asarray(df["arrival_hour"])
+    departure = np.asarray(df["departure_hour"])
+    battery = np.asarray(df["battery_kwh"])
+    initial_soc = np.asarray(df["initial_soc"])
+    target_soc = np.asarray(df["target_soc"])
+    energy_needed = np.asarray(df["energy_needed_kwh"])
+
+    if np.any((arrival < 0) | (arrival > 23)):
         raise ValueError("arrival_hour out of range")
 
-    if (df["departure_hour"] < 1).any() or (df["departure_hour"] > 23).any():
+    if np.any((departure < 1) | (departure > 23)):
         raise ValueError("departure_hour out of range")
 
-    if (df["departure_hour"] <= df["arrival_hour"]).any():
+    if np.any(departure <= arrival):
         raise ValueError("departure_hour must be greater than arrival_hour")
 
-    if (df["battery_kwh"] <= 0).any():
+    if np.any(battery <= 0):
         raise ValueError("battery_kwh must be positive")
 
-    if ((df["initial_soc"] < 0) | (df["initial_soc"] > 1)).any():
+    if np.any((initial_soc < 0) | (initial_soc > 1)):
         raise ValueError("initial_soc must be between 0 and 1")
 
-    if ((df["target_soc"] < 0) | (df["target_soc"] > 1)).any():
+    if np.any((target_soc < 0) | (target_soc > 1)):
         raise ValueError("target_soc must be between 0 and 1")
 
-    if (df["target_soc"] <= df["initial_soc"]).any():
+    if np.any(target_soc <= initial_soc):
         raise ValueError("target_soc must be greater than initial_soc")
 
-    if (df["energy_needed_kwh"] <= 0).any():
+    if np.any(energy_needed <= 0):
         raise ValueError("energy_needed_kwh must be positive")
 
 
 if __name__ == "__main__":
     profiles = generate_ev_profiles(n_evs=10, seed=42)
     validate_profiles(profiles)
-    print(profiles.head(10).to_string(index=False))
\ No newline at end of file
+    print(profiles.to_frame().head(10).to_string(index=False))
\ No newline at end of file